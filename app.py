@@ -3,8 +3,15 @@ import pandas as pd
 import os
 from convert_orders import convert_shopify_to_singpost
 import json
+import logging
 import tempfile
 
+# Send module log output (e.g. google_slides) to the console; DEBUG details stay off
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 st.set_page_config(
     page_title="Shopify to SingPost Converter",
     page_icon="📦",
@@ -16,6 +23,16 @@ st.title("Shopify to SingPost Converter")
 st.write("Upload your Shopify order export CSV to convert it to SingPost ezy2ship format")
 st.caption("v2.2.0 - retail-mail-international template with IRREPK service code")
 
+def write_credentials_file(credentials_path, content):
+    """Write credentials to disk only if they changed, so the mtime-keyed get_credentials cache stays valid"""
+    if os.path.exists(credentials_path):
+        with open(credentials_path, "r") as f:
+            if f.read() == content:
+                return
+
+    with open(credentials_path, "w") as f:
+        f.write(content)
+
 # Function to handle credentials from secrets
 def setup_credentials_from_secrets():
     credentials_loaded = False
@@ -29,8 +46,7 @@ def setup_credentials_from_secrets():
         creds_dict = dict(st.secrets["google_credentials"])
 
         # Write to a temporary file
-        with open(credentials_path, "w") as f:
-            json.dump(creds_dict, f)
+        write_credentials_file(credentials_path, json.dumps(creds_dict))
 
         os.environ['GOOGLE_CREDENTIALS_PATH'] = credentials_path
 
@@ -88,8 +104,7 @@ with st.sidebar:
                 
                 # Save to a file
                 credentials_path = "google_credentials.json"
-                with open(credentials_path, "w") as f:
-                    f.write(credentials_content)
+                write_credentials_file(credentials_path, credentials_content)
                 
                 st.session_state.credentials_path = credentials_path
                 os.environ['GOOGLE_CREDENTIALS_PATH'] = credentials_path
@@ -340,6 +340,7 @@ def convert_shopify_to_singpost(shopify_file, output_file):
             f"Error: Input file '{shopify_file}' not found. Please check the file path.",
             None,
             None,
+            None,
         )
 
     # Read and clean Shopify orders
@@ -798,7 +799,7 @@ def convert_shopify_to_singpost(shopify_file, output_file):
 
 # Example usage
 if __name__ == "__main__":
-    result, pdf_path, slides_url = convert_shopify_to_singpost(
+    result, intl_df, us_df, slides_url = convert_shopify_to_singpost(
         "orders_export.csv", "singpost_orders.csv"
     )
     print(result)
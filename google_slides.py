@@ -1,11 +1,95 @@
 import os
-import json
+import functools
+import logging
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.oauth2 import service_account
+import google_auth_httplib2
+import httplib2
 from datetime import datetime
+from zoneinfo import ZoneInfo
 import re
-import pytz
+import random
 import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ['https://www.googleapis.com/auth/presentations', 
+          'https://www.googleapis.com/auth/drive']
+
+# Placeholders on the template slide and the label field that replaces each one
+LABEL_PLACEHOLDERS = (
+    ('#ORDERNUM#', 'order_number'),
+    ('#CUSTOMERNAME#', 'name'),
+    ('#PHONE#', 'phone'),
+    ('#ADDRESS#', 'address'),
+    ('#POSTALCODE#', 'postal'),
+    ('#QUANTITY#', 'quantity'),
+    ('#SIZE#', 'size'),
+    ('#MATERIAL#', 'material'),
+)
+
+# Kid sizes such as "(100-110cm)" are shown on the label by their lower bound
+_KID_SIZE_RE = re.compile(r'\(([^-)]+)-[^)]*cm')
+
+# The date slide is dated in the shop's local time
+LABEL_TIMEZONE = ZoneInfo('Asia/Singapore')
+
+# Styling applied to the date slide text after it is rewritten
+DATE_TEXT_STYLE = {
+    'textRange': {
+        'type': 'ALL'
+    },
+    'style': {
+        'bold': True,
+        'fontSize': {
+            'magnitude': 24,
+            'unit': 'PT'
+        },
+        'foregroundColor': {
+            'opaqueColor': {
+                'rgbColor': {
+                    'red': 0,
+                    'green': 0,
+                    'blue': 0
+                }
+            }
+        }
+    },
+    'fields': 'bold,fontSize,foregroundColor'
+}
+
+DATE_PARAGRAPH_STYLE = {
+    'textRange': {
+        'type': 'ALL'
+    },
+    'style': {
+        'alignment': 'CENTER'
+    },
+    'fields': 'alignment'
+}
+
+# Presentation ID in a Google Slides URL, e.g. .../presentation/d/<ID>/edit
+_TEMPLATE_ID_RE = re.compile(r'/d/([a-zA-Z0-9-_]+)')
+
+# A bare presentation ID, as accepted in place of the full URL
+_BARE_TEMPLATE_ID_RE = re.compile(r'[a-zA-Z0-9_-]+')
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_API_ATTEMPTS = 5
+MAX_RETRY_DELAY = 30
+
+# Field mask for the initial presentation fetch
+PRESENTATION_FIELDS = (
+    'title,revisionId,'
+    'slides(objectId,pageElements(objectId,shape/text/textElements/textRun/content))'
+)
+
+# Date/template slide IDs of presentations edited by this process, keyed by
+# presentation ID and tagged with the revision our last write produced
+_TEMPLATE_CACHE = {}
 
 def create_shipping_slides(order_details, credentials_path, template_id=None):
     """
@@ -20,58 +104,21 @@ def create_shipping_slides(order_details, credentials_path, template_id=None):
         presentation_url: URL of the edited presentation
     """
     try:
-        # Print detailed information for debugging
-        print(f"Starting create_shipping_slides with {len(order_details)} orders")
-        print(f"Credentials path: {credentials_path}")
-        print(f"File exists: {os.path.exists(credentials_path)}")
-        print(f"Template ID: {template_id or 'None'}")
-        
-        # Validate credentials file
-        try:
-            with open(credentials_path, 'r') as f:
-                cred_content = f.read()
-                # Validate it's proper JSON
-                try:
-                    cred_json = json.loads(cred_content)
-                    required_fields = ['type', 'project_id', 'private_key', 'client_email']
-                    missing_fields = [field for field in required_fields if field not in cred_json]
-                    if missing_fields:
-                        print(f"WARNING: Credentials file is missing required fields: {missing_fields}")
-                    else:
-                        print("Credentials file contains all required fields")
-                except json.JSONDecodeError as e:
-                    print(f"ERROR: Credentials file is not valid JSON: {str(e)}")
-                    return None
-        except Exception as e:
-            print(f"ERROR: Could not read credentials file: {str(e)}")
-            return None
-        
-        # Set up credentials
-        SCOPES = ['https://www.googleapis.com/auth/presentations', 
-                 'https://www.googleapis.com/auth/drive']
+        # Log detailed information for debugging
+        logger.info("Starting create_shipping_slides with %d orders", len(order_details))
+        logger.debug("Credentials path: %s", credentials_path)
+        logger.debug("File exists: %s", os.path.exists(credentials_path))
+        logger.debug("Template ID: %s", template_id)
         
-        try:
-            print("Creating credentials object...")
-            credentials = service_account.Credentials.from_service_account_file(
-                credentials_path, scopes=SCOPES)
-            print(f"Credentials created successfully: {credentials.service_account_email}")
-        except Exception as e:
-            print(f"ERROR creating credentials: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return None
+        # Labels are dated in Singapore time, whatever timezone the server runs in
+        today = today_label()
         
-        # Create services
+        # Set up credentials (reused across runs while the file is unchanged) and services
         try:
-            print("Building slides service...")
-            slides_service = build('slides', 'v1', credentials=credentials)
-            print("Building drive service...")
-            drive_service = build('drive', 'v3', credentials=credentials)
-            print("Services built successfully")
+            credentials = get_credentials(credentials_path, os.path.getmtime(credentials_path))
+            slides_service, drive_service = get_services(credentials)
         except Exception as e:
-            print(f"ERROR building services: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error setting up Google services: %s", e)
             return None
         
         # Use the existing presentation
@@ -80,297 +127,474 @@ def create_shipping_slides(order_details, credentials_path, template_id=None):
         
         try:
             if template_id:
-                print(f"Using existing presentation: {template_id}")
+                logger.debug("Using existing presentation: %s", template_id)
                 presentation_id = template_id
             else:
-                print("No template ID provided, cannot proceed")
+                logger.error("No template ID provided, cannot proceed")
                 return None
                 
             presentation_url = f"https://docs.google.com/presentation/d/{presentation_id}/edit"
-            print(f"Presentation URL: {presentation_url}")
+            logger.debug("Presentation URL: %s", presentation_url)
         except Exception as e:
-            print(f"ERROR accessing presentation: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error accessing presentation: %s", e)
             return None
         
         # Get current presentation details
         try:
-            presentation = slides_service.presentations().get(
-                presentationId=presentation_id
-            ).execute()
-            print(f"Fetched presentation details, title: {presentation.get('title')}")
-            
-            # Get existing slides
-            slides = presentation.get('slides', [])
-            print(f"Presentation has {len(slides)} existing slides")
-            
-            # Ensure we have at least 2 slides (first for date, second for template)
-            if len(slides) < 2:
-                print("ERROR: Template presentation should have at least 2 slides")
+            template_info = get_template_info(slides_service, presentation_id)
+            if template_info is None:
                 return presentation_url
-                
-            # Save the date slide and template slide
-            date_slide_id = slides[0].get('objectId')
-            template_slide_id = slides[1].get('objectId')
             
-            print(f"Found date slide with ID: {date_slide_id}")
-            print(f"Found template slide with ID: {template_slide_id}")
+            date_slide_id = template_info['date_slide_id']
+            date_text_id = template_info['date_text_id']
+            template_slide_id = template_info['template_slide_id']
+        except HttpError as e:
+            if e.resp.status in (403, 404):
+                # The service account can't see the template unless it's shared with it
+                logger.error(
+                    "Cannot open presentation %s (HTTP %s). Share it with the service "
+                    "account %s and give it Editor access.",
+                    presentation_id, e.resp.status, credentials.service_account_email)
+            else:
+                logger.exception("Error getting presentation details: %s", e)
+            return None
         except Exception as e:
-            print(f"ERROR getting presentation details: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error getting presentation details: %s", e)
             return None
         
         # IMPLEMENTATION OF THE SLIDE CREATION
+        # Every new slide gets its ID up-front via objectIds, so all duplicates,
+        # moves and text updates can be sent together in a single batchUpdate.
         try:
             # Step 1: Create a new date slide by duplicating the existing date slide
-            print("Creating new date slide at the beginning...")
+            logger.debug("Creating new date slide at the beginning...")
+            
+            new_date_slide_id = new_object_id('date')
+            date_object_ids = {date_slide_id: new_date_slide_id}
+            new_date_text_id = None
+            if date_text_id:
+                new_date_text_id = f"{new_date_slide_id}_text"
+                date_object_ids[date_text_id] = new_date_text_id
             
             duplicate_request = {
                 'duplicateObject': {
-                    'objectId': date_slide_id
+                    'objectId': date_slide_id,
+                    'objectIds': date_object_ids
                 }
             }
             
-            response = slides_service.presentations().batchUpdate(
-                presentationId=presentation_id,
-                body={'requests': [duplicate_request]}
-            ).execute()
+            # Move the new date slide to position 0
+            move_request = {
+                'updateSlidesPosition': {
+                    'slideObjectIds': [new_date_slide_id],
+                    'insertionIndex': 0  # Put at the beginning
+                }
+            }
             
-            new_date_slide_id = response.get('replies', [{}])[0].get('duplicateObject', {}).get('objectId')
-            if not new_date_slide_id:
-                print("WARNING: Could not get ID for the new date slide")
+            all_requests = [duplicate_request, move_request]
+            
+            # Update the date on the new date slide
+            if new_date_text_id:
+                all_requests.extend(build_date_requests(new_date_text_id, today))
             else:
-                print(f"Created new date slide with ID: {new_date_slide_id}")
-                
-                # Move the new date slide to position 0
-                move_request = {
-                    'updateSlidesPosition': {
-                        'slideObjectIds': [new_date_slide_id],
-                        'insertionIndex': 0  # Put at the beginning
-                    }
-                }
-                
-                slides_service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': [move_request]}
-                ).execute()
-                print("Moved date slide to the beginning")
-                
-                # Update the date on the new date slide
-                update_date_slide(slides_service, presentation_id, new_date_slide_id)
+                logger.warning("No text elements found on date slide")
             
             # Step 1b: Create a new template slide by duplicating the existing template slide
             # and position it after the new date slide
-            print("Creating new template slide at position 1...")
+            logger.debug("Creating new template slide at position 1...")
             
+            new_template_slide_id = new_object_id('template')
             duplicate_template_request = {
                 'duplicateObject': {
-                    'objectId': template_slide_id
+                    'objectId': template_slide_id,
+                    'objectIds': {template_slide_id: new_template_slide_id}
                 }
             }
             
-            template_response = slides_service.presentations().batchUpdate(
-                presentationId=presentation_id,
-                body={'requests': [duplicate_template_request]}
-            ).execute()
-            
-            new_template_slide_id = template_response.get('replies', [{}])[0].get('duplicateObject', {}).get('objectId')
-            if not new_template_slide_id:
-                print("WARNING: Could not get ID for the new template slide")
-            else:
-                print(f"Created new template slide with ID: {new_template_slide_id}")
-                
-                # Move the new template slide to position 1 (right after the date slide)
-                template_move_request = {
-                    'updateSlidesPosition': {
-                        'slideObjectIds': [new_template_slide_id],
-                        'insertionIndex': 1  # Put right after the date slide
-                    }
+            # Move the new template slide to position 1 (right after the date slide)
+            template_move_request = {
+                'updateSlidesPosition': {
+                    'slideObjectIds': [new_template_slide_id],
+                    'insertionIndex': 1  # Put right after the date slide
                 }
-                
-                slides_service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': [template_move_request]}
-                ).execute()
-                print("Moved template slide to position 1")
-                
-                # Now use this new template slide as our actual template
-                template_slide_id = new_template_slide_id
+            }
+            
+            all_requests.extend([duplicate_template_request, template_move_request])
             
-            # Step 2: Create order detail slides, one for each order
-            print(f"Creating {len(order_details)} order slides...")
-            insert_index = 2  # Start inserting after the template slide (now at position 1)
+            # Now use this new template slide as our actual template
+            template_slide_id = new_template_slide_id
             
-            for i, order in enumerate(order_details):
-                print(f"Processing order {i+1}: {order.get('order_number', 'unknown')}")
+            # Step 2: Create order detail slides, one for each order.
+            # A duplicate is inserted right after its source, so copying the
+            # template (at index 1) in reverse order leaves the order slides in
+            # order from index 2 without any further moves.
+            logger.debug("Creating %d order slides...", len(order_details))
+            
+            for i, order in reversed(list(enumerate(order_details))):
+                logger.debug("Processing order %d: %s", i + 1, order.get('order_number', 'unknown'))
                 
-                # Create a copy of the template slide
+                # Create a copy of the template slide with a known ID
+                new_slide_id = new_object_id(f'ord_{i}')
                 duplicate_request = {
                     'duplicateObject': {
-                        'objectId': template_slide_id
+                        'objectId': template_slide_id,
+                        'objectIds': {template_slide_id: new_slide_id}
                     }
                 }
+                all_requests.append(duplicate_request)
                 
-                response = slides_service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': [duplicate_request]}
-                ).execute()
-                
-                new_slide_id = response.get('replies', [{}])[0].get('duplicateObject', {}).get('objectId')
-                if not new_slide_id:
-                    print(f"WARNING: Could not get ID for the new order slide {i+1}")
-                    continue
-                    
-                print(f"Created new order slide with ID: {new_slide_id}")
-                
-                # Position this slide after the template slide and before other order slides
-                position_request = {
-                    'updateSlidesPosition': {
-                        'slideObjectIds': [new_slide_id],
-                        'insertionIndex': insert_index
-                    }
+                # Fill in the order details on this slide using placeholder replacement.
+                # Requests in a batch run in order, so the slide exists by this point.
+                all_requests.extend(build_placeholder_requests(new_slide_id, order))
+            
+            # Step 3: Submit everything as one batchUpdate
+            logger.debug("Submitting %d requests in a single batch", len(all_requests))
+            response = execute_with_retry(slides_service.presentations().batchUpdate(
+                presentationId=presentation_id,
+                body={'requests': all_requests}
+            ))
+            revision_id = get_revision_id(response)
+            
+            # The new date and template slides are what the next run will copy.
+            # Remember them with the revision this batch produced, so an
+            # unchanged presentation does not need to be fetched again.
+            if revision_id:
+                _TEMPLATE_CACHE[presentation_id] = {
+                    'revision_id': revision_id,
+                    'date_slide_id': new_date_slide_id,
+                    'date_text_id': new_date_text_id,
+                    'template_slide_id': template_slide_id
                 }
-                
-                slides_service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': [position_request]}
-                ).execute()
-                print(f"Positioned order slide at index {insert_index}")
-                
-                # Wait briefly to ensure the slide is fully created
-                time.sleep(0.5)
-                
-                # Now update the order details on this slide using placeholder replacement
-                update_slide_with_placeholders(slides_service, presentation_id, new_slide_id, order)
-                
-                # Increment the insertion index for the next slide
-                insert_index += 1
+            else:
+                _TEMPLATE_CACHE.pop(presentation_id, None)
             
             # Success!
-            print(f"Successfully created slides for {len(order_details)} orders")
+            logger.info("Successfully created slides for %d orders", len(order_details))
             return presentation_url
             
         except Exception as e:
-            print(f"ERROR in main slide creation: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in main slide creation: %s", e)
             return presentation_url
         
     except Exception as e:
-        print(f"ERROR in create_shipping_slides: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in create_shipping_slides: %s", e)
         return None
 
-def update_date_slide(slides_service, presentation_id, slide_id):
+@functools.lru_cache(maxsize=4)
+def get_credentials(credentials_path, modified_time):
     """
-    Update the date on a slide to today's date
+    Load the service account credentials from a credentials file
+    
+    Results are cached, so repeat runs skip loading the credentials file and
+    reuse the access token. The file's modification time is part of the
+    cache key so replaced credentials are picked up.
     
     Args:
-        slides_service: Google Slides API service
-        presentation_id: ID of the presentation
-        slide_id: ID of the date slide
+        credentials_path: Path to the service account JSON credentials file
+        modified_time: Modification time of the credentials file
+        
+    Returns:
+        credentials: Service account credentials scoped to SCOPES
     """
-    try:
-        print(f"Updating date on slide {slide_id}...")
+    # from_service_account_file raises on a malformed or incomplete key file
+    logger.debug("Creating credentials object...")
+    credentials = service_account.Credentials.from_service_account_file(
+        credentials_path, scopes=SCOPES)
+    logger.info("Credentials created successfully: %s", credentials.service_account_email)
+    return credentials
+
+def get_services(credentials):
+    """
+    Create the Slides and Drive services for a set of credentials
+    
+    The services are built per call rather than cached: httplib2 is not
+    thread-safe and Streamlit runs each session in its own thread.
+    
+    Args:
+        credentials: Service account credentials
         
-        # Get today's date
-        today = datetime.now().strftime("%B %d, %Y")
+    Returns:
+        (slides_service, drive_service): Google API services
+    """
+    # Both services share one authorized connection within this call
+    authed_http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+    
+    # static_discovery uses the discovery documents bundled with googleapiclient
+    # instead of downloading them
+    logger.debug("Building slides service...")
+    slides_service = build('slides', 'v1', http=authed_http, static_discovery=True)
+    logger.debug("Building drive service...")
+    drive_service = build('drive', 'v3', http=authed_http, static_discovery=True)
+    logger.debug("Services built successfully")
+    
+    return slides_service, drive_service
+
+def get_template_info(slides_service, presentation_id):
+    """
+    Find the date slide, its text element and the template slide, reusing the
+    cached structure while the presentation's revision is unchanged
+    
+    Args:
+        slides_service: Google Slides API service
+        presentation_id: ID of the presentation
         
-        # Get the slide details
-        slide = slides_service.presentations().pages().get(
+    Returns:
+        template_info: Dictionary with date_slide_id, date_text_id and
+            template_slide_id, or None if the presentation has fewer than 2 slides
+    """
+    cached = _TEMPLATE_CACHE.get(presentation_id)
+    if cached:
+        revision = execute_with_retry(slides_service.presentations().get(
             presentationId=presentation_id,
-            pageObjectId=slide_id
-        ).execute()
-        
-        # Find text elements on the slide
-        text_elements = []
-        for element in slide.get('pageElements', []):
-            if 'shape' in element and 'text' in element.get('shape', {}):
-                text_elements.append(element.get('objectId'))
-                print(f"Found text element on date slide: {element.get('objectId')}")
+            fields='revisionId'
+        ))
+        if revision.get('revisionId') == cached['revision_id']:
+            logger.debug("Presentation unchanged since last run, using cached template slides")
+            return cached
+        logger.debug("Presentation changed since last run, fetching template slides again")
+    
+    # Only slide IDs and text shapes are needed, not masters, layouts or styling
+    presentation = execute_with_retry(slides_service.presentations().get(
+        presentationId=presentation_id,
+        fields=PRESENTATION_FIELDS
+    ))
+    logger.debug("Fetched presentation details, title: %s", presentation.get('title'))
+    
+    # Get existing slides
+    slides = presentation.get('slides', [])
+    logger.debug("Presentation has %d existing slides", len(slides))
+    
+    # Ensure we have at least 2 slides (first for date, second for template)
+    if len(slides) < 2:
+        logger.error("Template presentation should have at least 2 slides")
+        return None
+    
+    # Save the date slide and template slide
+    date_slide_id = slides[0].get('objectId')
+    template_slide_id = slides[1].get('objectId')
+    
+    logger.debug("Found date slide with ID: %s", date_slide_id)
+    logger.debug("Found template slide with ID: %s", template_slide_id)
+    
+    # Find the text element holding the date, so its copy can be addressed
+    # directly instead of fetching the new slide again
+    date_text_id = None
+    for element in slides[0].get('pageElements', []):
+        if 'shape' in element and 'text' in element.get('shape', {}):
+            date_text_id = element.get('objectId')
+            logger.debug("Found text element on date slide: %s", date_text_id)
+            break
+    
+    return {
+        'revision_id': presentation.get('revisionId'),
+        'date_slide_id': date_slide_id,
+        'date_text_id': date_text_id,
+        'template_slide_id': template_slide_id
+    }
+
+def execute_with_retry(request, max_attempts=MAX_API_ATTEMPTS):
+    """
+    Execute a Google API request, retrying rate limits and server errors
+    with jittered exponential backoff
+    
+    Args:
+        request: Google API request object to execute
+        max_attempts: Total number of attempts before the error is raised
         
-        if not text_elements:
-            print("WARNING: No text elements found on date slide")
-            return
+    Returns:
+        response: Parsed API response
+    """
+    for attempt in range(max_attempts):
+        try:
+            return request.execute()
+        except HttpError as e:
+            status = e.resp.status
+            if status not in RETRYABLE_STATUSES or attempt == max_attempts - 1:
+                raise
+            
+            # Honour the server's Retry-After if given, otherwise back off exponentially.
+            # Either way the wait is capped so a request thread is never held for long.
+            retry_after = e.resp.get('retry-after', '')
+            if retry_after.isdigit():
+                delay = min(int(retry_after), MAX_RETRY_DELAY)
+            else:
+                delay = min(2 ** attempt, MAX_RETRY_DELAY) + random.random()
+            logger.warning("API returned %s, retrying in %.1fs (attempt %d/%d)",
+                           status, delay, attempt + 1, max_attempts)
+            time.sleep(delay)
+
+def get_revision_id(response):
+    """Return the revision ID a batchUpdate response left the presentation at"""
+    if not response:
+        return None
+    return response.get('writeControl', {}).get('requiredRevisionId')
+
+def new_object_id(prefix):
+    """
+    Generate a unique Slides object ID so new slides can be referenced
+    in the same batchUpdate that creates them
+    
+    Args:
+        prefix: Readable prefix for the ID (e.g. 'date', 'ord_0')
         
-        # Update the first text element with today's date
-        update_requests = []
+    Returns:
+        object_id: ID string accepted by the Slides API
+    """
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+def build_date_requests(text_object_id, today):
+    """
+    Build the requests that replace the date slide's text with today's date
+    
+    Args:
+        text_object_id: ID of the text element holding the date
+        today: Date text to show, e.g. from today_label()
         
+    Returns:
+        update_requests: List of batchUpdate requests
+    """
+    logger.debug("Setting date in text element %s to: %s", text_object_id, today)
+    
+    return [
         # Clear the existing text
-        update_requests.append({
+        {
             'deleteText': {
-                'objectId': text_elements[0],
+                'objectId': text_object_id,
                 'textRange': {
                     'type': 'ALL'
                 }
             }
-        })
-        
+        },
         # Insert the new date
-        update_requests.append({
+        {
             'insertText': {
-                'objectId': text_elements[0],
+                'objectId': text_object_id,
                 'insertionIndex': 0,
                 'text': today
             }
-        })
-        
+        },
         # Apply text style to match the template
-        update_requests.append({
+        {
             'updateTextStyle': {
-                'objectId': text_elements[0],
-                'textRange': {
-                    'type': 'ALL'
-                },
-                'style': {
-                    'bold': True,
-                    'fontSize': {
-                        'magnitude': 24,
-                        'unit': 'PT'
-                    },
-                    'foregroundColor': {
-                        'opaqueColor': {
-                            'rgbColor': {
-                                'red': 0,
-                                'green': 0,
-                                'blue': 0
-                            }
-                        }
-                    }
-                },
-                'fields': 'bold,fontSize,foregroundColor'
+                'objectId': text_object_id,
+                **DATE_TEXT_STYLE
             }
-        })
-        
+        },
         # Apply paragraph style to center the text
-        update_requests.append({
+        {
             'updateParagraphStyle': {
-                'objectId': text_elements[0],
-                'textRange': {
-                    'type': 'ALL'
-                },
-                'style': {
-                    'alignment': 'CENTER'
-                },
-                'fields': 'alignment'
+                'objectId': text_object_id,
+                **DATE_PARAGRAPH_STYLE
             }
-        })
+        }
+    ]
+
+def today_label():
+    """Return today's date in Singapore, formatted for the date slide"""
+    return datetime.now(LABEL_TIMEZONE).strftime("%B %d, %Y")
+
+def format_label_fields(order):
+    """
+    Format an order's details into the text shown for each label field
+    
+    Args:
+        order: Dictionary containing order information
         
-        # Execute all updates
-        slides_service.presentations().batchUpdate(
-            presentationId=presentation_id,
-            body={'requests': update_requests}
-        ).execute()
+    Returns:
+        label_fields: Dictionary of field name to label text, keyed like
+            the fields in LABEL_PLACEHOLDERS
+    """
+    # Prepare order information
+    quantity = "2" if order.get('is_bundle', False) else "1"
+    size = order.get('size', '')
+    material = order.get('material', '')
+    
+    # Format the size
+    size_match = _KID_SIZE_RE.search(size)
+    size_display = f"{size_match.group(1)}cm" if size_match else size
         
-        print(f"Successfully updated date to: {today}")
+    # Format the phone number to consistent +65 format
+    phone = order.get('phone', '')
+    if phone:
+        # Remove any leading apostrophes
+        if phone.startswith("'"):
+            phone = phone[1:]
         
-    except Exception as e:
-        print(f"ERROR updating date slide: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        # If it doesn't start with '+65', add it
+        if not phone.startswith('+65'):
+            # If it starts with a '6' or '65', remove it to avoid doubling the country code
+            if phone.startswith('65'):
+                phone = phone[2:]
+            elif phone.startswith('6'):
+                phone = phone[1:]
+            
+            # Add the +65 prefix
+            phone = f"+65 {phone}"
+        
+        # Format with space after +65 and between groups of digits
+        # First ensure there's a space after +65
+        if '+65' in phone and not phone.startswith('+65 '):
+            phone = phone.replace('+65', '+65 ')
+        
+        # If phone is just digits with no spaces, add a space between the 4th and 5th digits
+        if len(phone.replace('+65 ', '').replace(' ', '')) == 8:
+            digits = phone.replace('+65 ', '').replace(' ', '')
+            phone = f"+65 {digits[:4]} {digits[4:]}"
+        
+    # Combine address lines
+    address1 = order.get('address1', '')
+    address2 = order.get('address2', '')
+    address = "\n".join(line for line in (address1, address2) if line and line.strip())
+    
+    # Remove any leading apostrophe from postal code
+    postal_code = order.get('postal', '')
+    if postal_code and postal_code.startswith("'"):
+        postal_code = postal_code[1:]
+    
+    # Values for each label field
+    return {
+        'order_number': f"#{order.get('order_number', '').replace('#', '')}",
+        'name': order.get('name', ''),
+        'phone': phone,
+        'address': address,
+        'postal': postal_code,
+        'quantity': quantity,
+        'size': size_display,
+        'material': material
+    }
+
+def build_placeholder_requests(slide_id, order):
+    """
+    Build the placeholder replacement requests for one order slide
+    
+    Args:
+        slide_id: ID of the slide to update
+        order: Dictionary containing order information
+        
+    Returns:
+        replace_requests: List of batchUpdate requests
+    """
+    logger.debug("Building placeholder replacements on slide %s for order: %s",
+                 slide_id, order.get('order_number', 'unknown'))
+    
+    label_fields = format_label_fields(order)
+    
+    # Create replacement requests
+    replace_requests = []
+    for placeholder, field in LABEL_PLACEHOLDERS:
+        logger.debug("Creating replacement: '%s' -> '%s'", placeholder, label_fields[field])
+        replace_requests.append({
+            'replaceAllText': {
+                'containsText': {
+                    'text': placeholder,
+                    'matchCase': True
+                },
+                'replaceText': label_fields[field],
+                'pageObjectIds': [slide_id]
+            }
+        })
+    
+    return replace_requests
 
 def update_slide_with_placeholders(slides_service, presentation_id, slide_id, order):
     """
@@ -381,150 +605,36 @@ def update_slide_with_placeholders(slides_service, presentation_id, slide_id, or
         presentation_id: ID of the presentation
         slide_id: ID of the slide to update
         order: Dictionary containing order information
+        
+    Returns:
+        response: batchUpdate response, or None if the update failed
     """
     try:
-        print(f"Updating slide {slide_id} with placeholder replacements for order: {order.get('order_number', 'unknown')}")
-        
-        # Prepare order information
-        quantity = "2" if order.get('is_bundle', False) else "1"
-        size = order.get('size', '')
-        material = order.get('material', '')
-        
-        # Format the size
-        if '(' in size and 'cm' in size:
-            size_display = size.split('(')[1].replace(')', '').split('-')[0] + 'cm'
-        else:
-            size_display = size
-            
-        # Format the phone number to consistent +65 format
-        phone = order.get('phone', '')
-        if phone:
-            # Remove any leading apostrophes
-            if phone.startswith("'"):
-                phone = phone[1:]
-            
-            # If it doesn't start with '+65', add it
-            if not phone.startswith('+65'):
-                # If it starts with a '6' or '65', remove it to avoid doubling the country code
-                if phone.startswith('65'):
-                    phone = phone[2:]
-                elif phone.startswith('6'):
-                    phone = phone[1:]
-                
-                # Add the +65 prefix
-                phone = f"+65 {phone}"
-            
-            # Format with space after +65 and between groups of digits
-            # First ensure there's a space after +65
-            if '+65' in phone and not phone.startswith('+65 '):
-                phone = phone.replace('+65', '+65 ')
-            
-            # If phone is just digits with no spaces, add a space between the 4th and 5th digits
-            if len(phone.replace('+65 ', '').replace(' ', '')) == 8:
-                digits = phone.replace('+65 ', '').replace(' ', '')
-                phone = f"+65 {digits[:4]} {digits[4:]}"
-            
-        # Combine address lines
-        address1 = order.get('address1', '')
-        address2 = order.get('address2', '')
-        address = f"{address1}\n{address2}" if address2 and address2.strip() else address1
-        
-        # Remove any leading apostrophe from postal code
-        postal_code = order.get('postal', '')
-        if postal_code and postal_code.startswith("'"):
-            postal_code = postal_code[1:]
-        
-        # Create replacements for placeholders
-        replacements = [
-            {
-                'find': '#ORDERNUM#',
-                'replace': f"#{order.get('order_number', '').replace('#', '')}"
-            },
-            {
-                'find': '#CUSTOMERNAME#',
-                'replace': order.get('name', '')
-            },
-            {
-                'find': '#PHONE#',
-                'replace': phone
-            },
-            {
-                'find': '#ADDRESS#',
-                'replace': address
-            },
-            {
-                'find': '#POSTALCODE#',
-                'replace': postal_code
-            },
-            {
-                'find': '#QUANTITY#',
-                'replace': quantity
-            },
-            {
-                'find': '#SIZE#',
-                'replace': size_display
-            },
-            {
-                'find': '#MATERIAL#',
-                'replace': material
-            }
-        ]
-        
-        # Create replacement requests
-        replace_requests = []
-        for replacement in replacements:
-            print(f"Creating replacement: '{replacement['find']}' -> '{replacement['replace']}'")
-            replace_requests.append({
-                'replaceAllText': {
-                    'containsText': {
-                        'text': replacement['find'],
-                        'matchCase': True
-                    },
-                    'replaceText': replacement['replace'],
-                    'pageObjectIds': [slide_id]
-                }
-            })
+        replace_requests = build_placeholder_requests(slide_id, order)
         
         # Execute replacements
-        if replace_requests:
-            print(f"Executing {len(replace_requests)} replacement requests")
-            try:
-                slides_service.presentations().batchUpdate(
-                    presentationId=presentation_id,
-                    body={'requests': replace_requests}
-                ).execute()
-                print("Successfully executed replacements")
-            except Exception as e:
-                print(f"WARNING: Error executing batch replacements: {str(e)}")
-                
-                # Try replacing one at a time
-                print("Trying individual replacements...")
-                for i, req in enumerate(replace_requests):
-                    try:
-                        slides_service.presentations().batchUpdate(
-                            presentationId=presentation_id,
-                            body={'requests': [req]}
-                        ).execute()
-                        print(f"Successfully executed replacement {i+1}")
-                    except Exception as e2:
-                        print(f"Failed replacement {i+1}: {str(e2)}")
-        else:
-            print("WARNING: No replacement requests were created")
+        logger.debug("Executing %d replacement requests", len(replace_requests))
+        response = execute_with_retry(slides_service.presentations().batchUpdate(
+            presentationId=presentation_id,
+            body={'requests': replace_requests}
+        ))
+        logger.debug("Successfully executed replacements")
+        return response
     
     except Exception as e:
-        print(f"ERROR updating slide with placeholders: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating slide with placeholders: %s", e)
 
 def get_template_id_from_url(url):
-    """Extract the presentation ID from a Google Slides URL"""
+    """Extract the presentation ID from a Google Slides URL, or pass a bare ID through"""
     if not url:
         return None
+    
+    url = url.strip()
+    if _BARE_TEMPLATE_ID_RE.fullmatch(url):
+        return url
         
-    match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
-    if match:
-        return match.group(1)
-    return None
+    match = _TEMPLATE_ID_RE.search(url)
+    return match.group(1) if match else None
 
 # Legacy functions for backward compatibility
 def update_order_details(slides_service, presentation_id, slide_id, order):
@@ -533,12 +643,12 @@ def update_order_details(slides_service, presentation_id, slide_id, order):
 
 def find_table_cells(slides_service, presentation_id, slide_id):
     """Legacy function - kept for backward compatibility but no longer used"""
-    print("Warning: find_table_cells is deprecated and will not work properly")
+    logger.warning("find_table_cells is deprecated and will not work properly")
     return {}
 
 def update_text_fields(slides_service, presentation_id, text_fields, order):
     """Legacy function - kept for backward compatibility but no longer used"""
-    print("Warning: update_text_fields is deprecated and will not work properly")
+    logger.warning("update_text_fields is deprecated and will not work properly")
     return
 
 def direct_update_text_on_slide(slides_service, presentation_id, slide_id, order):
@@ -547,4 +657,26 @@ def direct_update_text_on_slide(slides_service, presentation_id, slide_id, order
 
 def update_table_based_slide(slides_service, presentation_id, slide_id, order):
     """Legacy function that redirects to the new placeholder replacement approach"""
-    return update_slide_with_placeholders(slides_service, presentation_id, slide_id, order)
\ No newline at end of file
+    return update_slide_with_placeholders(slides_service, presentation_id, slide_id, order)
+def update_date_slide(slides_service, presentation_id, slide_id):
+    """Legacy function that dates a slide's first text shape using the shared date requests"""
+    try:
+        slide = execute_with_retry(slides_service.presentations().pages().get(
+            presentationId=presentation_id,
+            pageObjectId=slide_id,
+            fields='pageElements(objectId,shape/text/textElements/textRun/content)'
+        ))
+        
+        text_id = next((element.get('objectId') for element in slide.get('pageElements', [])
+                        if 'text' in element.get('shape', {})), None)
+        if not text_id:
+            logger.warning("No text elements found on date slide %s", slide_id)
+            return None
+        
+        return execute_with_retry(slides_service.presentations().batchUpdate(
+            presentationId=presentation_id,
+            body={'requests': build_date_requests(text_id, today_label())}
+        ))
+    except Exception as e:
+        logger.exception("Error updating date slide: %s", e)
+        return None